@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Per-page timing benchmark for item image extraction.
+
+Compares the single-pass find_item_images() against the previous
+three-pass implementation and checks that both return the same images.
+
+Usage:
+    python benchmarks/bench_item_page_extraction.py                 # synthetic pages
+    python benchmarks/bench_item_page_extraction.py page1.html ...  # saved wiki pages
+"""
+
+import os
+import sys
+import time
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dayz_item_scraper import BASE_URL, find_item_images  # noqa: E402
+
+REPEAT = 20
+
+
+def legacy_extract_images(soup: BeautifulSoup, item_name: str) -> List[Tuple[str, str]]:
+    """The previous three-pass extraction logic, kept here as the reference result."""
+    images = []
+    found_main_image = False
+    
+    main_content = soup.find('div', {'class': ['mw-parser-output', 'WikiaArticle']})
+    if main_content:
+        first_img = main_content.find('img')
+        if first_img and first_img.get('src'):
+            src = first_img.get('src')
+            if ("static.wikia.nocookie.net" in src and
+                any(ext in src.lower() for ext in ['.png', '.jpg', '.jpeg']) and
+                    not any(ignore in src.lower() for ignore in ['logo', 'banner', 'nav', 'header'])):
+                if not src.startswith('http'):
+                    src = "https:" + src if src.startswith('//') else BASE_URL + src
+                if "/revision/" not in src:
+                    src = src + "/revision/latest"
+                filename = src.split('/')[-1].split('.')[0].split('?')[0]
+                variant_name = filename.replace('_', ' ').replace('%20', ' ')
+                images.append((src, variant_name))
+                found_main_image = True
+    
+    gallery_section = soup.find('span', {'id': 'Gallery'})
+    if gallery_section:
+        gallery_parent = gallery_section.parent
+        for section in gallery_parent.find_next_siblings():
+            if section.name in ['h2', 'h3'] and section != gallery_parent:
+                break
+            for img in section.find_all('img') if hasattr(section, 'find_all') else []:
+                src = img.get('src', '')
+                if ("static.wikia.nocookie.net" in src and
+                    any(ext in src.lower() for ext in ['.png', '.jpg', '.jpeg']) and
+                        not any(ignore in src.lower() for ignore in ['logo', 'banner', 'nav', 'header', 'fandom'])):
+                    if not src.startswith('http'):
+                        src = "https:" + src if src.startswith('//') else BASE_URL + src
+                    if "/revision/" not in src:
+                        src = src + "/revision/latest"
+                    filename = src.split('/')[-1].split('.')[0].split('?')[0]
+                    variant_name = filename.replace('_', ' ').replace('%20', ' ')
+                    if not any(existing_src == src for existing_src, _ in images):
+                        images.append((src, variant_name))
+    
+    if not found_main_image:
+        item_words = [word.lower() for word in item_name.lower().replace('-', ' ').split() if len(word) > 2]
+        for img in soup.find_all('img')[:10]:
+            src = img.get('src', '')
+            if not src or "static.wikia.nocookie.net" not in src:
+                continue
+            if not any(ext in src.lower() for ext in ['.png', '.jpg', '.jpeg']):
+                continue
+            if any(ignore in src.lower() for ignore in [
+                'logo', 'banner', 'nav', 'header', 'footer', 'fandom',
+                'discord', 'reddit', 'steam', 'cursor', 'edit', 'view'
+            ]):
+                continue
+            if any(size in src for size in ['/16px-', '/20px-', '/24px-', '/32px-', '/40px-']):
+                continue
+            filename = src.split('/')[-1].split('.')[0].split('?')[0].lower()
+            if any(word in filename for word in item_words):
+                if not src.startswith('http'):
+                    src = "https:" + src if src.startswith('//') else BASE_URL + src
+                if "/revision/" not in src:
+                    src = src + "/revision/latest"
+                variant_name = filename.replace('_', ' ').replace('%20', ' ')
+                if not any(existing_src == src for existing_src, _ in images):
+                    images.append((src, variant_name))
+    
+    return images[:3]
+
+
+def synthetic_item_page(item_name: str, with_main_icon: bool, gallery_size: int) -> str:
+    """Builds an item page resembling the wiki layout (navigation, infobox, gallery, footer)."""
+    slug = item_name.replace(' ', '_')
+    cdn = "https://static.wikia.nocookie.net/dayz_gamepedia/images"
+    nav = ''.join(f'<li><a href="/wiki/Nav{i}"><img src="{cdn}/a/a{i}/Nav_icon_{i}.png"></a></li>'
+                  for i in range(40))
+    body_text = ''.join(f'<p>Paragraph {i} about the {item_name}. <a href="/wiki/Link{i}">link</a></p>'
+                        for i in range(60))
+    main_icon = f'<aside><img src="{cdn}/b/b1/{slug}.png/revision/latest?cb=1"></aside>' if with_main_icon else ''
+    gallery = ''.join(f'<div class="wikia-gallery-item"><img src="{cdn}/c/c{i}/{slug}_Variant_{i}.png"></div>'
+                      for i in range(gallery_size))
+    footer = ''.join(f'<a href="https://www.fandom.com/f{i}"><img src="{cdn}/f/f{i}/Footer_{i}.png"></a>'
+                     for i in range(30))
+    return (
+        '<html><head><script>var c={"wgCurRevisionId":1};</script></head><body>'
+        f'<header><img src="{cdn}/0/00/Site_logo.png"></header><nav><ul>{nav}</ul></nav>'
+        f'<div class="WikiaArticle"><div class="mw-parser-output">{main_icon}{body_text}'
+        f'<h2><span id="Gallery">Gallery</span></h2><div class="gallery">{gallery}</div>'
+        f'<h2><span id="Trivia">Trivia</span></h2>{body_text}</div></div>'
+        f'<footer>{footer}</footer></body></html>'
+    )
+
+
+def time_per_page(function, soup: BeautifulSoup, item_name: str) -> float:
+    """Returns the best-of-REPEAT run time in milliseconds."""
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function(soup, item_name)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = []
+        for path in sys.argv[1:]:
+            with open(path, 'r', encoding='utf-8') as f:
+                item_name = os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+                pages.append((item_name, f.read()))
+    else:
+        pages = [
+            ("Mosin 9130", synthetic_item_page("Mosin 9130", True, 6)),
+            ("Tactical Helmet", synthetic_item_page("Tactical Helmet", False, 4)),
+            ("Canned Beans", synthetic_item_page("Canned Beans", True, 0)),
+        ]
+    
+    print(f"{'page':<24} {'legacy ms':>10} {'single-pass ms':>15} {'speedup':>8}  result")
+    mismatches = 0
+    for item_name, html in pages:
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        expected = legacy_extract_images(soup, item_name)
+        images, _ = find_item_images(soup, item_name)
+        actual = [(src, variant_name) for src, variant_name, _ in images]
+        matches = actual == expected
+        mismatches += not matches
+        
+        legacy_ms = time_per_page(legacy_extract_images, soup, item_name)
+        single_pass_ms = time_per_page(find_item_images, soup, item_name)
+        print(f"{item_name[:24]:<24} {legacy_ms:>10.3f} {single_pass_ms:>15.3f} "
+              f"{legacy_ms / single_pass_ms:>7.2f}x  {'same' if matches else 'MISMATCH'}")
+    
+    if mismatches:
+        print(f"❌ {mismatches} page(s) returned different images")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,11 +16,24 @@ __author__ = "Community Project"
 __license__ = "MIT"
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+import io
+import json
 import os
 import time
 import re
-from typing import List, Tuple, Set, Dict
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple, Set, Dict, Optional
+from urllib.parse import quote, unquote
+
+# Pillow is optional - it is only needed for the image optimization stage
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
 
 # =============================================================================
 # CONFIGURATION SECTION
@@ -35,9 +48,65 @@ HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
+# Run state and reports live outside OUTPUT_DIR so they never end up in the icon pack
+STATE_DIR = "scraper_state"
+
 # Create output directory if it doesn't exist
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# =============================================================================
+# IMAGE OPTIMIZATION SETTINGS
+# =============================================================================
+#
+# After downloading, every image is post-processed in a process pool:
+# PNGs are recompressed losslessly and stripped of metadata, and optional
+# WebP/AVIF copies are written next to the originals.
+
+OPTIMIZE_IMAGES = True                  # Requires Pillow (pip install Pillow)
+OPTIMIZE_WORKERS = min(os.cpu_count() or 2, 61)  # Worker processes (Windows allows at most 61)
+EMIT_WEBP = False                       # Write a .webp copy next to each image
+EMIT_AVIF = False                       # Write an .avif copy (needs Pillow built with AVIF support)
+LOSSY_QUALITY = 90                      # WebP quality for JPEG sources, AVIF quality for all sources
+OPTIMIZATION_REPORT = os.path.join(STATE_DIR, "optimization_report.json")
+
+# =============================================================================
+# NEGATIVE CACHE SETTINGS
+# =============================================================================
+#
+# Item pages that failed (HTTP error, unparseable page, no usable image) are
+# skipped on later runs until their TTL expires or the wiki page changes.
+
+API_URL = BASE_URL + "/api.php"
+API_BATCH_SIZE = 50  # MediaWiki limit for titles per query
+NEGATIVE_CACHE_FILE = os.path.join(STATE_DIR, "negative_cache.json")
+NEGATIVE_CACHE_TTLS = {
+    'no_image': 7 * 24 * 3600,    # Page loaded fine but has no usable image
+    'parse_miss': 3 * 24 * 3600,  # Page structure not recognized
+    'http_error': 24 * 3600,      # 404, 410 and other 4xx errors (429 and 5xx are not cached)
+}
+
+# =============================================================================
+# PAGE INDEX SETTINGS
+# =============================================================================
+#
+# Item links are deduplicated by wiki page ID. Resolved titles are kept between
+# runs and refreshed after PAGE_INDEX_TTL in case articles get moved.
+
+PAGE_INDEX_FILE = os.path.join(STATE_DIR, "page_index.json")
+PAGE_INDEX_TTL = 30 * 24 * 3600
+
+# =============================================================================
+# STATUS SERVER SETTINGS
+# =============================================================================
+#
+# Optional local endpoint with live progress: open http://127.0.0.1:8765/ in a
+# browser, or poll http://127.0.0.1:8765/status.json.
+
+STATUS_SERVER_ENABLED = False
+STATUS_SERVER_HOST = "127.0.0.1"
+STATUS_SERVER_PORT = 8765
+THROUGHPUT_WINDOW = 60  # Seconds used for the rolling pages/sec and MB/sec rates
+
 # =============================================================================
 # WIKI CATEGORIES TO SCRAPE
 # =============================================================================
@@ -223,7 +292,7 @@ def extract_item_links_from_category(url: str) -> List[Tuple[str, str, str]]:
     target_category = map_wiki_category_to_folder(category_name)
     
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = http_get(url)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         
@@ -317,10 +386,191 @@ def extract_item_links_from_category(url: str) -> List[Tuple[str, str, str]]:
         
     except Exception as e:
         print(f"   ❌ Error loading {url}: {e}")
+        record_error('category_page')
         return []
 
 
-def extract_item_images_from_page(url: str, item_name: str) -> List[Tuple[str, str]]:
+# Image candidate regions, in priority order (lower value wins)
+PRIORITY_MAIN_ICON = 0
+PRIORITY_GALLERY = 1
+PRIORITY_FILENAME_MATCH = 2
+
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg']
+MAIN_ICON_IGNORE = ['logo', 'banner', 'nav', 'header']
+GALLERY_IGNORE = MAIN_ICON_IGNORE + ['fandom']
+FILENAME_MATCH_IGNORE = [
+    'logo', 'banner', 'nav', 'header', 'footer', 'fandom',
+    'discord', 'reddit', 'steam', 'cursor', 'edit', 'view'
+]
+SMALL_UI_SIZES = ['/16px-', '/20px-', '/24px-', '/32px-', '/40px-']
+FILENAME_MATCH_SCAN_LIMIT = 10  # Only the first images on a page are checked by filename
+
+
+def is_wiki_image(src: str, ignore_words: List[str]) -> bool:
+    """
+    Checks whether an image source is a wiki-hosted PNG/JPEG that is not a UI element.
+    
+    Args:
+        src: Image source attribute
+        ignore_words: Words that mark logos, banners and other UI images
+        
+    Returns:
+        True if the image is a candidate item image
+    """
+    src_lower = src.lower()
+    return ("static.wikia.nocookie.net" in src and
+            any(ext in src_lower for ext in IMAGE_EXTENSIONS) and
+            not any(ignore in src_lower for ignore in ignore_words))
+
+
+def normalize_image_src(src: str) -> str:
+    """
+    Turns an image source into a full URL pointing at the highest quality version.
+    
+    Args:
+        src: Image source attribute (absolute, protocol-relative or site-relative)
+        
+    Returns:
+        Absolute image URL ending in a revision path
+    """
+    # Ensure full URL
+    if not src.startswith('http'):
+        src = "https:" + src if src.startswith('//') else BASE_URL + src
+    
+    # Use highest quality version
+    if "/revision/" not in src:
+        src = src + "/revision/latest"
+    
+    return src
+
+
+def image_variant_name(src: str) -> str:
+    """
+    Derives a readable variant name from the last path segment of an image URL.
+    
+    Args:
+        src: Image URL
+        
+    Returns:
+        Variant name with underscores and encoded spaces replaced by spaces
+    """
+    filename = src.split('/')[-1].split('.')[0].split('?')[0]
+    return filename.replace('_', ' ').replace('%20', ' ')
+
+
+def _child_of(element: Tag, ancestor: Tag) -> Optional[Tag]:
+    """Returns the direct child of ancestor that contains element, or None."""
+    node = element
+    while node.parent is not None and node.parent is not ancestor:
+        node = node.parent
+    return node if node.parent is ancestor else None
+
+
+def find_item_images(soup: BeautifulSoup, item_name: str) -> Tuple[List[Tuple[str, str, int]], bool]:
+    """
+    Finds the item images on a parsed item page in a single pass over the document.
+    
+    Every <img> is visited once and tagged with the regions it belongs to:
+    1. Main icon - the first image inside the article body
+    2. Gallery - images in the sections following the 'Gallery' heading
+    3. Filename match - one of the first images whose filename contains
+       words from the item name (only used when there is no main icon)
+    
+    Candidates are then ordered by region priority and document position,
+    deduplicated with a set of normalized URLs and capped at 3 per item.
+    
+    Args:
+        soup: Parsed item page
+        item_name: Name of the item
+        
+    Returns:
+        Tuple of (list of (image_url, variant_name, priority), whether an
+        article body container was found on the page)
+    """
+    item_words = [word.lower() for word in item_name.lower().replace('-', ' ').split() if len(word) > 2]
+    
+    candidates = []  # (priority, image_url, variant_name)
+    main_content = None
+    main_icon_checked = False
+    found_main_image = False
+    gallery_parent = None
+    gallery_container = None
+    gallery_open = False
+    images_seen = 0
+    
+    for element in soup.descendants:
+        if not isinstance(element, Tag):
+            continue
+        
+        if element.name == 'div':
+            if main_content is None and set(element.get('class') or []) & {'mw-parser-output', 'WikiaArticle'}:
+                main_content = element
+            continue
+        
+        if element.name == 'span':
+            if gallery_parent is None and element.get('id') == 'Gallery':
+                gallery_parent = element.parent
+                gallery_container = gallery_parent.parent
+                gallery_open = gallery_container is not None
+            continue
+        
+        # The gallery ends at the next major section heading
+        if (gallery_open and element.name in ['h2', 'h3'] and
+                element.parent is gallery_container and element != gallery_parent):
+            gallery_open = False
+            continue
+        
+        if element.name != 'img':
+            continue
+        
+        src = element.get('src', '')
+        
+        # REGION 1: Main item icon - the first image in the article body
+        if main_content is not None and not main_icon_checked and _child_of(element, main_content) is not None:
+            main_icon_checked = True
+            if src and is_wiki_image(src, MAIN_ICON_IGNORE):
+                src_url = normalize_image_src(src)
+                candidates.append((PRIORITY_MAIN_ICON, src_url, image_variant_name(src_url)))
+                found_main_image = True
+        
+        # REGION 2: Gallery - images nested in the sections after the Gallery heading
+        if gallery_open:
+            section = _child_of(element, gallery_container)
+            if section is not None and section is not element and section is not gallery_parent:
+                if is_wiki_image(src, GALLERY_IGNORE):
+                    src_url = normalize_image_src(src)
+                    candidates.append((PRIORITY_GALLERY, src_url, image_variant_name(src_url)))
+        
+        # REGION 3: Filename match - only among the first images on the page
+        images_seen += 1
+        if images_seen <= FILENAME_MATCH_SCAN_LIMIT and src and is_wiki_image(src, FILENAME_MATCH_IGNORE):
+            if not any(size in src for size in SMALL_UI_SIZES):
+                filename = src.split('/')[-1].split('.')[0].split('?')[0].lower()
+                if any(word in filename for word in item_words):
+                    candidates.append((PRIORITY_FILENAME_MATCH, normalize_image_src(src),
+                                       image_variant_name(filename)))
+    
+    # Filename matches are only a fallback for pages without a main icon
+    if found_main_image:
+        candidates = [candidate for candidate in candidates if candidate[0] != PRIORITY_FILENAME_MATCH]
+    
+    # Stable sort keeps document order within each region
+    candidates.sort(key=lambda candidate: candidate[0])
+    
+    images = []
+    seen_urls = set()
+    for priority, src_url, variant_name in candidates:
+        if src_url in seen_urls:
+            continue
+        seen_urls.add(src_url)
+        images.append((src_url, variant_name, priority))
+    
+    # Limit to maximum 3 images per item to avoid clutter
+    return images[:3], main_content is not None
+
+
+def extract_item_images_from_page(url: str, item_name: str,
+                                  negative_cache: Optional[Dict[str, Dict]] = None) -> List[Tuple[str, str]]:
     """
     Extracts item images from an individual item's wiki page.
     
@@ -329,9 +579,14 @@ def extract_item_images_from_page(url: str, item_name: str) -> List[Tuple[str, s
     2. Look for gallery images (additional variants)
     3. Search for images with item name in filename (fallback)
     
+    All three strategies are evaluated in a single pass over the page,
+    see find_item_images().
+    
     Args:
         url: The item's wiki page URL
         item_name: Name of the item
+        negative_cache: Optional negative cache; failures are recorded here
+                        with their reason ('http_error', 'parse_miss', 'no_image')
         
     Returns:
         List of tuples: (image_url, variant_name)
@@ -345,132 +600,66 @@ def extract_item_images_from_page(url: str, item_name: str) -> List[Tuple[str, s
     print(f"🎯 Loading item page: {item_name}")
     
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = http_get(url)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         
+        # Revision the page was served at - lets the negative cache notice page edits
+        revision_match = re.search(r'"wgCurRevisionId":(\d+)', response.text)
+        revision = int(revision_match.group(1)) if revision_match else None
+        
+        found_images, found_content = find_item_images(soup, item_name)
+        
+        region_labels = {
+            PRIORITY_MAIN_ICON: "main icon",
+            PRIORITY_GALLERY: "gallery image",
+            PRIORITY_FILENAME_MATCH: "filename match",
+        }
         images = []
-        found_main_image = False
-        
-        # STRATEGY 1: Find the main item image (highest priority)
-        # The first large image in the main content is typically the item icon
-        main_content = soup.find('div', {'class': ['mw-parser-output', 'WikiaArticle']})
-        if main_content:
-            first_img = main_content.find('img')
-            if first_img and first_img.get('src'):
-                src = first_img.get('src')
-                
-                # Validate image source
-                if ("static.wikia.nocookie.net" in src and 
-                    any(ext in src.lower() for ext in ['.png', '.jpg', '.jpeg']) and
-                    not any(ignore in src.lower() for ignore in ['logo', 'banner', 'nav', 'header'])):
-                    
-                    # Ensure full URL
-                    if not src.startswith('http'):
-                        src = "https:" + src if src.startswith('//') else BASE_URL + src
-                    
-                    # Use highest quality version
-                    if "/revision/" not in src:
-                        src = src + "/revision/latest"
-                    
-                    # Extract clean filename
-                    filename = src.split('/')[-1].split('.')[0].split('?')[0]
-                    variant_name = filename.replace('_', ' ').replace('%20', ' ')
-                    
-                    images.append((src, variant_name))
-                    found_main_image = True
-                    print(f"   📷 Found main icon: {variant_name}")
-        
-        # STRATEGY 2: Search gallery section for additional variants
-        # Many item pages have gallery sections with different color variants
-        gallery_section = soup.find('span', {'id': 'Gallery'})
-        if gallery_section:
-            gallery_parent = gallery_section.parent
-            # Find all images in the gallery section
-            gallery_imgs = gallery_parent.find_next_siblings()
-            for section in gallery_imgs:
-                # Stop at next major section
-                if section.name in ['h2', 'h3'] and section != gallery_parent:
-                    break
-                
-                # Extract images from this section
-                for img in section.find_all('img') if hasattr(section, 'find_all') else []:
-                    src = img.get('src', '')
-                    if ("static.wikia.nocookie.net" in src and 
-                        any(ext in src.lower() for ext in ['.png', '.jpg', '.jpeg']) and
-                        not any(ignore in src.lower() for ignore in ['logo', 'banner', 'nav', 'header', 'fandom'])):
-                        
-                        # Ensure full URL
-                        if not src.startswith('http'):
-                            src = "https:" + src if src.startswith('//') else BASE_URL + src
-                        
-                        # Use highest quality
-                        if "/revision/" not in src:
-                            src = src + "/revision/latest"
-                        
-                        filename = src.split('/')[-1].split('.')[0].split('?')[0]
-                        variant_name = filename.replace('_', ' ').replace('%20', ' ')
-                        
-                        # Avoid duplicates
-                        if not any(existing_src == src for existing_src, _ in images):
-                            images.append((src, variant_name))
-                            print(f"   📷 Found gallery image: {variant_name}")
-        
-        # STRATEGY 3: Filename-based search (fallback for pages without clear main image)
-        # Look for images where filename contains words from the item name
-        if not found_main_image:
-            item_words = [word.lower() for word in item_name.lower().replace('-', ' ').split() if len(word) > 2]
-            
-            all_imgs = soup.find_all('img')
-            for img in all_imgs[:10]:  # Limit to first 10 images for performance
-                src = img.get('src', '')
-                if not src or "static.wikia.nocookie.net" not in src:
-                    continue
-                
-                if not any(ext in src.lower() for ext in ['.png', '.jpg', '.jpeg']):
-                    continue
-                
-                # Filter out UI elements and logos
-                if any(ignore in src.lower() for ignore in [
-                    'logo', 'banner', 'nav', 'header', 'footer', 'fandom',
-                    'discord', 'reddit', 'steam', 'cursor', 'edit', 'view'
-                ]):
-                    continue
-                
-                # Filter out small UI images
-                if any(size in src for size in ['/16px-', '/20px-', '/24px-', '/32px-', '/40px-']):
-                    continue
-                
-                filename = src.split('/')[-1].split('.')[0].split('?')[0].lower()
-                
-                # Check if filename contains item-relevant words
-                name_matches = 0
-                for word in item_words:
-                    if word in filename:
-                        name_matches += 1
-                
-                if name_matches > 0:  # At least one word must match
-                    if not src.startswith('http'):
-                        src = "https:" + src if src.startswith('//') else BASE_URL + src
-                    
-                    if "/revision/" not in src:
-                        src = src + "/revision/latest"
-                    
-                    variant_name = filename.replace('_', ' ').replace('%20', ' ')
-                    
-                    # Avoid duplicates
-                    if not any(existing_src == src for existing_src, _ in images):
-                        images.append((src, variant_name))
-                        print(f"   📷 Found filename match: {variant_name}")
+        for src, variant_name, priority in found_images:
+            images.append((src, variant_name))
+            print(f"   📷 Found {region_labels[priority]}: {variant_name}")
         
-        # Limit to maximum 3 images per item to avoid clutter
-        images = images[:3]
+        if not images:
+            record_error('no_image' if found_content else 'parse_miss')
+        
+        if negative_cache is not None and not images:
+            # No article body at all means we did not understand the page layout
+            if not found_content:
+                record_failure(negative_cache, url, item_name, 'parse_miss',
+                               'no article content container found', revision)
+            else:
+                record_failure(negative_cache, url, item_name, 'no_image',
+                               'no usable image on page', revision)
         
         print(f"   🖼️  Extracted {len(images)} relevant images")
         return images
+    
+    except requests.HTTPError as e:
+        print(f"   ❌ Error loading item page {url}: {e}")
+        status_code = e.response.status_code if e.response is not None else None
+        
+        # Rate limiting and server errors are transient - do not cache them
+        if status_code is None or status_code == 429 or status_code >= 500:
+            record_error('http_transient')
+            return []
+        
+        record_error('http_error')
+        if negative_cache is not None:
+            record_failure(negative_cache, url, item_name, 'http_error', f"HTTP {status_code}")
+        return []
+    
+    except requests.RequestException as e:
+        # Network problems are transient - do not cache them
+        print(f"   ❌ Error loading item page {url}: {e}")
+        record_error('network')
+        return []
         
     except Exception as e:
         print(f"   ❌ Error loading item page {url}: {e}")
+        record_error('parse_miss')
+        if negative_cache is not None:
+            record_failure(negative_cache, url, item_name, 'parse_miss', str(e))
         return []
 
 
@@ -529,6 +718,38 @@ def clean_filename(filename: str) -> str:
 # DOWNLOAD FUNCTIONS
 # =============================================================================
 
+def build_image_path(url: str, item_name: str, image_variant: str, category: str, base_folder: str) -> str:
+    """
+    Builds the local file path an image will be saved to.
+    
+    Args:
+        url: Image URL to download
+        item_name: Name of the item
+        image_variant: Variant description (e.g., 'Green', 'With_Attachments')
+        category: Target category folder
+        base_folder: Base download directory
+        
+    Returns:
+        Full path of the image file inside the category folder
+    """
+    # Generate descriptive filename
+    if image_variant and image_variant.lower() != item_name.lower():
+        filename = clean_filename(f"{item_name}_{image_variant}")
+    else:
+        filename = clean_filename(f"{item_name}")
+    
+    # Ensure correct file extension
+    if not any(filename.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg']):
+        # Extract extension from URL
+        url_ext = url.split('.')[-1].split('?')[0].split('/')[0]
+        if url_ext.lower() in ['png', 'jpg', 'jpeg']:
+            filename = filename.rsplit('.', 1)[0] + '.' + url_ext
+        else:
+            filename = filename.rsplit('.', 1)[0] + '.png'
+    
+    return os.path.join(base_folder, category, filename)
+
+
 def download_image(url: str, item_name: str, image_variant: str, category: str, base_folder: str) -> bool:
     """
     Downloads a single image and saves it to the appropriate category folder.
@@ -551,31 +772,18 @@ def download_image(url: str, item_name: str, image_variant: str, category: str,
     """
     try:
         # Create category folder structure
-        category_folder = create_category_folder(base_folder, category)
+        create_category_folder(base_folder, category)
         
-        # Generate descriptive filename
-        if image_variant and image_variant.lower() != item_name.lower():
-            filename = clean_filename(f"{item_name}_{image_variant}")
-        else:
-            filename = clean_filename(f"{item_name}")
-        
-        # Ensure correct file extension
-        if not any(filename.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg']):
-            # Extract extension from URL
-            url_ext = url.split('.')[-1].split('?')[0].split('/')[0]
-            if url_ext.lower() in ['png', 'jpg', 'jpeg']:
-                filename = filename.rsplit('.', 1)[0] + '.' + url_ext
-            else:
-                filename = filename.rsplit('.', 1)[0] + '.png'
+        file_path = build_image_path(url, item_name, image_variant, category, base_folder)
+        filename = os.path.basename(file_path)
         
         # Check if file already exists (avoid re-downloading)
-        file_path = os.path.join(category_folder, filename)
         if os.path.exists(file_path):
             print(f"   ⏭️  Skipped (already exists): {category}/{filename}")
             return True
         
         # Download image
-        response = requests.get(url, headers=HEADERS)
+        response = http_get(url, kind='image')
         response.raise_for_status()
         
         # Save to file
@@ -587,9 +795,841 @@ def download_image(url: str, item_name: str, image_variant: str, category: str,
         
     except Exception as e:
         print(f"   ❌ Download error for {url}: {e}")
+        record_error('download')
         return False
 
 
+# =============================================================================
+# IMAGE OPTIMIZATION
+# =============================================================================
+
+def pillow_supports(image_format: str) -> bool:
+    """
+    Checks whether the installed Pillow build can write the given format.
+    
+    Args:
+        image_format: Pillow format name (e.g., 'WEBP', 'AVIF')
+        
+    Returns:
+        True if Pillow is installed and has an encoder for the format
+    """
+    if Image is None:
+        return False
+    Image.init()
+    return image_format.upper() in Image.SAVE
+
+
+def _write_file_atomically(file_path: str, data: bytes) -> None:
+    """Writes data to a temporary file first so a crash never leaves a truncated image."""
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, file_path)
+
+
+def _png_bit_depth(file_path: str) -> int:
+    """Reads the bit depth from a PNG's IHDR chunk (Pillow decodes 16-bit PNGs to 8-bit modes)."""
+    with open(file_path, 'rb') as f:
+        header = f.read(25)
+    # 8 byte signature, IHDR length/type, width, height, then the bit depth byte
+    return header[24] if len(header) == 25 and header[12:16] == b'IHDR' else 0
+
+
+def _pixels_match(img, data: bytes) -> bool:
+    """Decodes re-encoded PNG bytes and checks that size, mode, frames and pixels are unchanged."""
+    with Image.open(io.BytesIO(data)) as recompressed:
+        recompressed.load()
+        if (recompressed.size != img.size or recompressed.mode != img.mode or
+                getattr(recompressed, 'n_frames', 1) != getattr(img, 'n_frames', 1)):
+            return False
+        # Palette images may get a trimmed palette, so compare the actual colors
+        if img.mode in ['P', 'PA']:
+            return recompressed.convert('RGBA').tobytes() == img.convert('RGBA').tobytes()
+        return recompressed.tobytes() == img.tobytes()
+
+
+def optimize_image(file_path: str, emit_webp: bool = False, emit_avif: bool = False) -> Dict:
+    """
+    Optimizes a single downloaded image. Runs inside a worker process.
+    
+    This function handles:
+    - Lossless PNG recompression (the file is only replaced if it gets smaller
+      and decodes to exactly the same pixels)
+    - Stripping metadata (text chunks, EXIF and ICC profiles are not re-written)
+    - Writing optional WebP/AVIF copies next to the original
+    
+    Args:
+        file_path: Path of the downloaded image
+        emit_webp: Whether to write a .webp copy
+        emit_avif: Whether to write an .avif copy
+        
+    Returns:
+        Report entry with sizes before/after and sizes of the extra formats
+    """
+    result = {
+        'file': file_path,
+        'format': None,
+        'original_size': 0,
+        'optimized_size': 0,
+        'variants': {},
+        'skipped': None,
+        'error': None,
+    }
+    
+    try:
+        original_size = os.path.getsize(file_path)
+        result['original_size'] = original_size
+        result['optimized_size'] = original_size
+        
+        with Image.open(file_path) as img:
+            img.load()
+            result['format'] = img.format
+            
+            # Lossless PNG recompression - pixel data is untouched, only the
+            # zlib stream is rebuilt and ancillary metadata is dropped.
+            # Animated and 16-bit PNGs are left alone: Pillow would keep only
+            # the first frame or reduce them to 8 bits per channel.
+            if img.format == 'PNG':
+                if getattr(img, 'is_animated', False):
+                    result['skipped'] = 'animated PNG'
+                elif _png_bit_depth(file_path) > 8:
+                    result['skipped'] = 'PNG with more than 8 bits per channel'
+                else:
+                    buffer = io.BytesIO()
+                    img.save(buffer, 'PNG', optimize=True, icc_profile=None)
+                    data = buffer.getvalue()
+                    if len(data) < original_size:
+                        if _pixels_match(img, data):
+                            _write_file_atomically(file_path, data)
+                            result['optimized_size'] = len(data)
+                        else:
+                            result['skipped'] = 'recompressed image does not match the original'
+            
+            # Extra formats - skipped when an up-to-date copy already exists
+            base_path = os.path.splitext(file_path)[0]
+            extra_formats = []
+            if emit_webp:
+                extra_formats.append(('webp', 'WEBP'))
+            if emit_avif:
+                extra_formats.append(('avif', 'AVIF'))
+            
+            for extension, image_format in extra_formats:
+                variant_path = f"{base_path}.{extension}"
+                if (not os.path.exists(variant_path) or
+                        os.path.getmtime(variant_path) < os.path.getmtime(file_path)):
+                    buffer = io.BytesIO()
+                    if image_format == 'WEBP' and img.format == 'PNG':
+                        img.save(buffer, image_format, lossless=True, method=6)
+                    else:
+                        img.save(buffer, image_format, quality=LOSSY_QUALITY)
+                    _write_file_atomically(variant_path, buffer.getvalue())
+                result['variants'][extension] = os.path.getsize(variant_path)
+    
+    except Exception as e:
+        result['error'] = str(e)
+    
+    return result
+
+
+def load_optimization_report(path: str = OPTIMIZATION_REPORT) -> Dict:
+    """
+    Loads the optimization report written by earlier runs.
+    
+    Args:
+        path: Location of the report file
+        
+    Returns:
+        The report dictionary (empty if no report exists yet)
+    """
+    if not os.path.exists(path):
+        return {}
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"   ⚠️ Could not read optimization report {path}: {e}")
+        return {}
+
+
+def needs_optimization(entry: Optional[Dict]) -> bool:
+    """
+    Decides whether an already downloaded image has to go through PHASE 4 again.
+    
+    Args:
+        entry: The file's entry in the previous optimization report, if any
+        
+    Returns:
+        True if the file was never optimized, failed last time, or lacks
+        a copy in a format that has been enabled since
+    """
+    if entry is None or entry.get('error'):
+        return True
+    
+    for extension, image_format, enabled in [('webp', 'WEBP', EMIT_WEBP), ('avif', 'AVIF', EMIT_AVIF)]:
+        if enabled and extension not in entry['variants'] and pillow_supports(image_format):
+            return True
+    return False
+
+
+def optimize_downloaded_images(file_paths: List[str], workers: int = OPTIMIZE_WORKERS) -> Dict:
+    """
+    Runs the optimization stage over all downloaded images in a process pool.
+    
+    Image encoding is CPU-bound, so processes (not threads) are used to
+    spread the work over all cores. A JSON report with before/after sizes
+    is written to OPTIMIZATION_REPORT. Entries from earlier runs are kept,
+    so the report covers the whole icon pack with the sizes as downloaded.
+    
+    Args:
+        file_paths: Paths of the downloaded images
+        workers: Number of worker processes
+        
+    Returns:
+        The report dictionary (totals plus one entry per file)
+    """
+    emit_webp = EMIT_WEBP
+    emit_avif = EMIT_AVIF
+    if emit_webp and not pillow_supports('WEBP'):
+        print("   ⚠️ This Pillow build cannot write WebP - skipping .webp output")
+        emit_webp = False
+    if emit_avif and not pillow_supports('AVIF'):
+        print("   ⚠️ This Pillow build cannot write AVIF - skipping .avif output")
+        emit_avif = False
+    
+    # Keep entries of files optimized in earlier runs that are still on disk
+    entries_by_file = {entry['file']: entry for entry in load_optimization_report().get('entries', [])
+                       if os.path.exists(entry['file'])}
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(optimize_image, path, emit_webp, emit_avif) for path in file_paths]
+        for i, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            entries_by_file[entry['file']] = entry
+            advance_phase()
+            if entry['error']:
+                print(f"   ❌ Optimization error for {entry['file']}: {entry['error']}")
+                record_error('optimization')
+            
+            # Progress updates every 100 images
+            if i % 100 == 0:
+                print(f"   📈 Optimization progress: {i}/{len(file_paths)}")
+    
+    entries = sorted(entries_by_file.values(), key=lambda entry: entry['file'])
+    original_total = sum(entry['original_size'] for entry in entries)
+    optimized_total = sum(entry['optimized_size'] for entry in entries)
+    variant_totals = {}
+    for entry in entries:
+        for extension, size in entry['variants'].items():
+            variant_totals[extension] = variant_totals.get(extension, 0) + size
+    
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'files': len(entries),
+        'errors': sum(1 for entry in entries if entry['error']),
+        'skipped': sum(1 for entry in entries if entry['skipped']),
+        'original_bytes': original_total,
+        'optimized_bytes': optimized_total,
+        'saved_bytes': original_total - optimized_total,
+        'variant_bytes': variant_totals,
+        'entries': entries,
+    }
+    
+    os.makedirs(os.path.dirname(OPTIMIZATION_REPORT), exist_ok=True)
+    with open(OPTIMIZATION_REPORT, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    
+    return report
+
+
+# =============================================================================
+# WIKI API HELPERS
+# =============================================================================
+
+def title_from_url(url: str) -> str:
+    """
+    Extracts the wiki page title from an article URL.
+    
+    Args:
+        url: Article URL (e.g., 'https://dayz.fandom.com/wiki/AKM')
+        
+    Returns:
+        Decoded page title with spaces (e.g., 'AKM', 'Mosin 9130')
+    """
+    path = url.split('/wiki/', 1)[-1].split('#')[0].split('?')[0]
+    return unquote(path).replace('_', ' ')
+
+
+def url_for_title(title: str) -> str:
+    """
+    Builds the canonical article URL for a page title.
+    
+    Args:
+        title: Page title (spaces or underscores)
+        
+    Returns:
+        Article URL encoded the way MediaWiki links to it
+    """
+    return BASE_URL + '/wiki/' + quote(title.replace(' ', '_'), safe=";@$!*(),/~:")
+
+
+def canonicalize_item_url(url: str) -> str:
+    """
+    Normalizes an article URL so that all spellings of a link compare equal.
+    
+    Handles URL-encoded and unencoded characters, spaces vs underscores,
+    repeated whitespace, query strings, fragments, and MediaWiki's
+    case-insensitive first letter. Redirects are not resolved here, see
+    resolve_page_ids().
+    
+    Args:
+        url: Article URL as found on a category page
+        
+    Returns:
+        Canonical article URL
+    """
+    title = re.sub(r'\s+', ' ', title_from_url(url)).strip()
+    title = title[:1].upper() + title[1:]
+    return url_for_title(title)
+
+
+def query_page_info(titles: List[str]) -> Dict[str, Dict]:
+    """
+    Looks up page IDs and latest revision IDs through the MediaWiki API.
+    
+    Titles are sent in batches of API_BATCH_SIZE, so hundreds of pages cost
+    only a handful of requests. Redirects and title normalization are
+    followed, and every requested title is mapped to the page it ends up on.
+    
+    Args:
+        titles: Page titles to look up
+        
+    Returns:
+        Dictionary: requested title -> {'pageid', 'lastrevid', 'title'}
+        Missing pages have pageid and lastrevid set to None. Titles from
+        batches that failed to load are left out.
+    """
+    results = {}
+    unique_titles = list(dict.fromkeys(titles))
+    
+    for start in range(0, len(unique_titles), API_BATCH_SIZE):
+        batch = unique_titles[start:start + API_BATCH_SIZE]
+        params = {
+            'action': 'query',
+            'prop': 'info',
+            'titles': '|'.join(batch),
+            'redirects': 1,
+            'format': 'json',
+        }
+        
+        try:
+            response = http_get(API_URL, kind='api', params=params)
+            response.raise_for_status()
+            query = response.json().get('query', {})
+        except Exception as e:
+            print(f"   ⚠️ Wiki API lookup failed: {e}")
+            record_error('api')
+            continue
+        
+        # Follow normalization ('Foo_bar' -> 'Foo bar') and redirects
+        renamed = {}
+        for step in query.get('normalized', []) + query.get('redirects', []):
+            renamed[step['from']] = step['to']
+        
+        pages_by_title = {page['title']: page for page in query.get('pages', {}).values()}
+        
+        for title in batch:
+            resolved = title
+            seen = set()
+            while resolved in renamed and resolved not in seen:
+                seen.add(resolved)
+                resolved = renamed[resolved]
+            
+            page = pages_by_title.get(resolved)
+            if page is None:
+                continue
+            missing = 'missing' in page or 'invalid' in page
+            results[title] = {
+                'pageid': None if missing else page.get('pageid'),
+                'lastrevid': None if missing else page.get('lastrevid'),
+                'title': page['title'],
+            }
+        
+        time.sleep(0.3)  # Respectful delay between API requests
+    
+    return results
+
+
+# =============================================================================
+# PAGE INDEX
+# =============================================================================
+#
+# Maps article titles to wiki page IDs so that links reached through different
+# anchor texts, redirects or URL spellings are processed only once. The index
+# is persisted, so titles resolved in earlier runs cost no API requests.
+
+def load_page_index(path: str = PAGE_INDEX_FILE) -> Dict[str, Dict]:
+    """
+    Loads the persisted page index.
+    
+    Args:
+        path: Location of the index file
+        
+    Returns:
+        Dictionary: page title -> {'pageid', 'title', 'resolved_at'}
+    """
+    if not os.path.exists(path):
+        return {}
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"   ⚠️ Could not read page index {path}: {e}")
+        return {}
+
+
+def save_page_index(index: Dict[str, Dict], path: str = PAGE_INDEX_FILE) -> None:
+    """
+    Persists the page index to disk.
+    
+    Args:
+        index: Page index to save
+        path: Location of the index file
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_file_atomically(path, json.dumps(index, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def resolve_page_ids(titles: List[str], index: Dict[str, Dict]) -> int:
+    """
+    Resolves page IDs and redirect targets for titles missing from the index.
+    
+    Entries older than PAGE_INDEX_TTL are refreshed, since articles can be
+    moved or turned into redirects on the wiki.
+    
+    Args:
+        titles: Page titles to resolve
+        index: Page index to update
+        
+    Returns:
+        Number of titles looked up through the API
+    """
+    now = time.time()
+    stale = [title for title in dict.fromkeys(titles)
+             if title not in index or index[title]['resolved_at'] + PAGE_INDEX_TTL <= now]
+    
+    for title, info in query_page_info(stale).items():
+        index[title] = {
+            'pageid': info['pageid'],
+            'title': info['title'],
+            'resolved_at': now,
+        }
+    
+    return len(stale)
+
+
+def deduplicate_item_links(item_links: List[Tuple[str, str, str]],
+                           index: Dict[str, Dict]) -> List[Tuple[str, str, str]]:
+    """
+    Removes links that point to the same wiki article.
+    
+    Items are keyed by page ID, so anchor-text variants, redirects and
+    URL-encoded spellings of one article collapse into a single item.
+    The item URL is replaced with the redirect target so PHASE 2 fetches
+    the article directly. Links that could not be resolved (API failure,
+    missing page) fall back to their canonical URL as the key.
+    
+    Items are named after the article title rather than the anchor text,
+    so the saved filenames do not depend on which link was seen first.
+    
+    Args:
+        item_links: List of tuples (item_url, item_name, target_category)
+        index: Page index used to look up page IDs
+        
+    Returns:
+        Deduplicated list of tuples (item_url, item_name, target_category),
+        keeping the category of the first occurrence of each article
+    """
+    unique_items = {}
+    for item_url, _, category in item_links:
+        item_url = canonicalize_item_url(item_url)
+        title = title_from_url(item_url)
+        entry = index.get(title)
+        
+        if entry and entry['pageid'] is not None:
+            key = entry['pageid']
+            title = entry['title']
+            item_url = url_for_title(title)
+        else:
+            key = item_url
+        
+        if key not in unique_items:
+            unique_items[key] = (item_url, title, category)
+    
+    return list(unique_items.values())
+
+
+# =============================================================================
+# NEGATIVE CACHE
+# =============================================================================
+#
+# Items whose pages return HTTP errors, cannot be parsed, or contain no usable
+# images are remembered between runs. Until the entry's TTL expires or the page
+# gets a new revision on the wiki, these items are skipped in PHASE 2.
+
+def load_negative_cache(path: str = NEGATIVE_CACHE_FILE) -> Dict[str, Dict]:
+    """
+    Loads the persisted negative cache.
+    
+    Args:
+        path: Location of the cache file
+        
+    Returns:
+        Dictionary: item URL -> failure entry (empty if no cache exists yet)
+    """
+    if not os.path.exists(path):
+        return {}
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"   ⚠️ Could not read negative cache {path}: {e}")
+        return {}
+
+
+def save_negative_cache(cache: Dict[str, Dict], path: str = NEGATIVE_CACHE_FILE) -> None:
+    """
+    Persists the negative cache to disk.
+    
+    Args:
+        cache: Dictionary of failure entries
+        path: Location of the cache file
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_file_atomically(path, json.dumps(cache, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def record_failure(cache: Dict[str, Dict], url: str, item_name: str, reason: str,
+                   detail: str = '', revision: Optional[int] = None) -> None:
+    """
+    Records a failed item in the negative cache.
+    
+    Args:
+        cache: Negative cache to update
+        url: The item's wiki page URL
+        item_name: Name of the item
+        reason: One of the NEGATIVE_CACHE_TTLS keys ('no_image', 'parse_miss', 'http_error')
+        detail: Human-readable detail (e.g., the HTTP status)
+        revision: Page revision the failure was observed on, if known
+    """
+    now = time.time()
+    cache[url] = {
+        'item_name': item_name,
+        'reason': reason,
+        'detail': detail,
+        'revision': revision,
+        'failed_at': now,
+        'expires_at': now + NEGATIVE_CACHE_TTLS[reason],
+    }
+
+
+def prune_negative_cache(cache: Dict[str, Dict]) -> int:
+    """
+    Removes entries whose TTL has expired.
+    
+    Args:
+        cache: Negative cache to prune
+        
+    Returns:
+        Number of removed entries
+    """
+    now = time.time()
+    expired = [url for url, entry in cache.items() if entry['expires_at'] <= now]
+    for url in expired:
+        del cache[url]
+    return len(expired)
+
+
+def invalidate_changed_pages(cache: Dict[str, Dict]) -> int:
+    """
+    Removes entries for pages that changed on the wiki since they failed.
+    
+    Uses one batched API request per API_BATCH_SIZE pages instead of
+    re-fetching every page. A page counts as changed when its latest
+    revision differs from the recorded one. Entries without a recorded
+    revision (HTTP errors, parser exceptions) only expire by TTL.
+    
+    Args:
+        cache: Negative cache to update
+        
+    Returns:
+        Number of removed entries
+    """
+    if not cache:
+        return 0
+    
+    titles_by_url = {url: title_from_url(url) for url in cache}
+    page_info = query_page_info(list(titles_by_url.values()))
+    
+    changed = []
+    for url, title in titles_by_url.items():
+        info = page_info.get(title)
+        if info is None or cache[url].get('revision') is None:
+            continue  # Lookup failed or nothing to compare - rely on the TTL instead
+        if info['lastrevid'] != cache[url].get('revision'):
+            changed.append(url)
+    
+    for url in changed:
+        del cache[url]
+    return len(changed)
+
+
+# =============================================================================
+# PROGRESS TRACKING
+# =============================================================================
+#
+# The scraper keeps its own counters (current phase, queue depths, in-flight
+# requests, errors) here. They are thread-safe so the optional status server
+# can read them while the crawl is running.
+
+_status_lock = threading.Lock()
+_throughput_events = deque()  # (timestamp, pages, bytes, items_done)
+_status = {
+    'started_at': time.time(),
+    'phase': 'starting',
+    'phase_started_at': time.time(),
+    'queues': {},          # phase -> {'done': int, 'total': int}
+    'in_flight': 0,
+    'requests': 0,
+    'pages_fetched': 0,
+    'bytes_downloaded': 0,
+    'errors': {},          # category -> count
+}
+
+
+def _record_event(pages: int = 0, size: int = 0, items: int = 0) -> None:
+    """Appends a throughput event and drops the ones outside the rolling window. Caller holds the lock."""
+    now = time.time()
+    _throughput_events.append((now, pages, size, items))
+    while _throughput_events and _throughput_events[0][0] < now - THROUGHPUT_WINDOW:
+        _throughput_events.popleft()
+
+
+def set_phase(phase: str, total: int) -> None:
+    """
+    Marks the start of a scraping phase.
+    
+    Args:
+        phase: Phase description shown on the status page
+        total: Number of work items in this phase
+    """
+    with _status_lock:
+        _status['phase'] = phase
+        _status['phase_started_at'] = time.time()
+        _status['queues'][phase] = {'done': 0, 'skipped': 0, 'total': total}
+        _throughput_events.clear()
+
+
+def advance_phase(count: int = 1, skipped: bool = False) -> None:
+    """
+    Marks work items of the current phase as done.
+    
+    Skipped items (e.g. known failures from the negative cache) finish
+    instantly, so they are counted separately and left out of the
+    items/sec rate that the ETA is based on.
+    
+    Args:
+        count: Number of finished work items
+        skipped: Whether the items were skipped without doing any work
+    """
+    with _status_lock:
+        queue = _status['queues'].get(_status['phase'])
+        if queue is not None:
+            queue['done'] += count
+            if skipped:
+                queue['skipped'] += count
+        if not skipped:
+            _record_event(items=count)
+
+
+def record_error(category: str) -> None:
+    """
+    Counts an error for the status page.
+    
+    Args:
+        category: Error category (e.g., 'http_error', 'download', 'api')
+    """
+    with _status_lock:
+        _status['errors'][category] = _status['errors'].get(category, 0) + 1
+
+
+def http_get(url: str, kind: str = 'page', **kwargs) -> requests.Response:
+    """
+    Performs a GET request and updates the request/throughput counters.
+    
+    Args:
+        url: URL to fetch
+        kind: 'page' for wiki pages (counted in pages/sec), 'image' or 'api' otherwise
+        **kwargs: Passed on to requests.get (headers default to HEADERS)
+        
+    Returns:
+        The response object
+    """
+    kwargs.setdefault('headers', HEADERS)
+    with _status_lock:
+        _status['in_flight'] += 1
+        _status['requests'] += 1
+    
+    size = 0
+    try:
+        response = requests.get(url, **kwargs)
+        size = len(response.content)
+        return response
+    finally:
+        with _status_lock:
+            _status['in_flight'] -= 1
+            _status['bytes_downloaded'] += size
+            pages = 1 if kind == 'page' and size else 0
+            _status['pages_fetched'] += pages
+            _record_event(pages=pages, size=size)
+
+
+def get_status_snapshot() -> Dict:
+    """
+    Builds a snapshot of all progress counters with rolling rates and an ETA.
+    
+    Returns:
+        JSON-serializable status dictionary
+    """
+    with _status_lock:
+        now = time.time()
+        while _throughput_events and _throughput_events[0][0] < now - THROUGHPUT_WINDOW:
+            _throughput_events.popleft()
+        
+        window = max(min(THROUGHPUT_WINDOW, now - _status['phase_started_at']), 1e-6)
+        pages = sum(event[1] for event in _throughput_events)
+        size = sum(event[2] for event in _throughput_events)
+        items = sum(event[3] for event in _throughput_events)
+        
+        queues = {phase: dict(queue, remaining=queue['total'] - queue['done'])
+                  for phase, queue in _status['queues'].items()}
+        current = queues.get(_status['phase'])
+        items_per_sec = items / window
+        eta = None
+        if current is not None and items_per_sec > 0:
+            eta = current['remaining'] / items_per_sec
+        
+        return {
+            'phase': _status['phase'],
+            'elapsed_seconds': round(now - _status['started_at'], 1),
+            'phase_elapsed_seconds': round(now - _status['phase_started_at'], 1),
+            'queues': queues,
+            'in_flight': _status['in_flight'],
+            'requests': _status['requests'],
+            'pages_fetched': _status['pages_fetched'],
+            'mb_downloaded': round(_status['bytes_downloaded'] / 1024 / 1024, 2),
+            'pages_per_sec': round(pages / window, 2),
+            'mb_per_sec': round(size / window / 1024 / 1024, 3),
+            'items_per_sec': round(items_per_sec, 2),
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'errors': dict(_status['errors']),
+        }
+
+
+# =============================================================================
+# STATUS SERVER
+# =============================================================================
+
+STATUS_PAGE_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>DayZ Item Scraper - Status</title>
+<style>
+  body { font-family: sans-serif; margin: 2em; }
+  table { border-collapse: collapse; }
+  td, th { padding: 4px 12px; border-bottom: 1px solid #ddd; text-align: left; }
+</style>
+</head>
+<body>
+<h1>DayZ Item Scraper</h1>
+<div id="status">Loading...</div>
+<script>
+function row(name, value) { return "<tr><th>" + name + "</th><td>" + value + "</td></tr>"; }
+function formatEta(seconds) {
+  if (seconds === null) { return "-"; }
+  var s = Math.round(seconds);
+  return Math.floor(s / 3600) + "h " + Math.floor(s % 3600 / 60) + "m " + (s % 60) + "s";
+}
+function refresh() {
+  fetch("status.json").then(function (r) { return r.json(); }).then(function (s) {
+    var html = "<table>" + row("Phase", s.phase) + row("ETA", formatEta(s.eta_seconds)) +
+      row("Elapsed", formatEta(s.elapsed_seconds)) + row("In-flight requests", s.in_flight) +
+      row("Pages/sec", s.pages_per_sec) + row("MB/sec", s.mb_per_sec) +
+      row("Items/sec", s.items_per_sec) + row("Pages fetched", s.pages_fetched) +
+      row("MB downloaded", s.mb_downloaded) + "</table><h2>Queues</h2><table>";
+    for (var phase in s.queues) {
+      var q = s.queues[phase];
+      html += row(phase, q.done + " / " + q.total + " (" + q.skipped + " skipped, " + q.remaining + " remaining)");
+    }
+    html += "</table><h2>Errors</h2><table>";
+    for (var category in s.errors) { html += row(category, s.errors[category]); }
+    document.getElementById("status").innerHTML = html + "</table>";
+  });
+}
+refresh();
+setInterval(refresh, 2000);
+</script>
+</body>
+</html>
+"""
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    """Serves the status snapshot as JSON (/status.json) and as an HTML page (/)."""
+    
+    def do_GET(self):
+        if self.path.split('?')[0] == '/status.json':
+            body = json.dumps(get_status_snapshot(), indent=2).encode('utf-8')
+            content_type = 'application/json'
+        elif self.path.split('?')[0] in ['/', '/index.html']:
+            body = STATUS_PAGE_HTML.encode('utf-8')
+            content_type = 'text/html; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Keep the console output for the scraper itself
+        pass
+
+
+def start_status_server(host: str = STATUS_SERVER_HOST, port: int = STATUS_SERVER_PORT) -> ThreadingHTTPServer:
+    """
+    Starts the status server in a background thread.
+    
+    Args:
+        host: Interface to bind to (localhost by default)
+        port: Port to listen on
+        
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    server = ThreadingHTTPServer((host, port), StatusRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, name='status-server', daemon=True)
+    thread.start()
+    return server
+
+
 # =============================================================================
 # CATEGORY DISCOVERY
 # =============================================================================
@@ -611,7 +1651,7 @@ def discover_additional_categories() -> List[str]:
     base_category_url = "https://dayz.fandom.com/wiki/Category:Items"
     
     try:
-        response = requests.get(base_category_url, headers=HEADERS)
+        response = http_get(base_category_url)
         if response.status_code == 200:
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -627,6 +1667,7 @@ def discover_additional_categories() -> List[str]:
     
     except Exception as e:
         print(f"   ⚠️ Error searching for additional categories: {e}")
+        record_error('category_page')
     
     print(f"   ➕ Discovered {len(additional_categories)} additional categories")
     return additional_categories
@@ -637,13 +1678,40 @@ def discover_additional_categories() -> List[str]:
 # =============================================================================
 
 def main():
+    """
+    Entry point: runs the scraper, with the optional status server around it.
+    
+    The status server is only a dashboard - if it cannot be started (e.g. the
+    port is in use) the crawl continues without it. The server is always shut
+    down, even when a phase raises.
+    """
+    status_server = None
+    if STATUS_SERVER_ENABLED:
+        try:
+            status_server = start_status_server(STATUS_SERVER_HOST, STATUS_SERVER_PORT)
+            print(f"📡 Live status: http://{STATUS_SERVER_HOST}:{STATUS_SERVER_PORT}/")
+        except OSError as e:
+            print(f"⚠️ Could not start status server on {STATUS_SERVER_HOST}:{STATUS_SERVER_PORT}: {e}")
+            print("   Continuing without live status...")
+    
+    try:
+        run_scraper()
+    finally:
+        set_phase("finished", 0)
+        if status_server:
+            status_server.shutdown()
+            status_server.server_close()
+
+
+def run_scraper():
     """
     Main execution function that orchestrates the entire scraping process.
     
-    The scraping process consists of three phases:
+    The scraping process consists of four phases:
     1. PHASE 1: Discover and collect all item links from category pages
     2. PHASE 2: Visit each item page and extract image URLs
     3. PHASE 3: Download all discovered images
+    4. PHASE 4: Optimize the downloaded images (lossless PNG, optional WebP/AVIF)
     
     This phased approach allows for better error handling and progress tracking.
     """
@@ -664,22 +1732,25 @@ def main():
     # =============================================================================
     
     print("\n🔍 PHASE 1: Collecting item links from ALL category pages...")
+    set_phase("PHASE 1: category pages", len(all_categories))
     for i, category_url in enumerate(all_categories, 1):
         print(f"\n[{i}/{len(all_categories)}] Category: {category_url.split('/')[-1]}")
         item_links = extract_item_links_from_category(category_url)
         all_item_links.extend(item_links)
+        advance_phase()
         time.sleep(0.8)  # Respectful delay between requests
     
     # Remove duplicates while preserving category information
-    # Some items might appear in multiple categories - we keep the first occurrence
-    unique_items = {}
-    for item_url, item_name, category in all_item_links:
-        key = (item_url, item_name)
-        if key not in unique_items:
-            unique_items[key] = category
+    # Some items might appear in multiple categories, under different link texts,
+    # or behind redirects - they are keyed by page ID and we keep the first occurrence
+    page_index = load_page_index()
+    titles = [title_from_url(canonicalize_item_url(url)) for url, _, _ in all_item_links]
+    looked_up = resolve_page_ids(titles, page_index)
+    save_page_index(page_index)
+    print(f"\n🆔 Resolved page IDs: {looked_up} titles looked up, {len(set(titles)) - looked_up} from the page index")
     
-    unique_item_links = [(url, name, cat) for (url, name), cat in unique_items.items()]
-    print(f"\n📊 Found {len(unique_item_links)} unique item links total")
+    unique_item_links = deduplicate_item_links(all_item_links, page_index)
+    print(f"📊 Found {len(unique_item_links)} unique item links total")
     print(f"📊 Removed {len(all_item_links) - len(unique_item_links)} duplicates")
     
     all_images = []
@@ -691,10 +1762,29 @@ def main():
     print("\n🎯 PHASE 2: Extracting images from ALL item pages...")
     total_items = len(unique_item_links)
     successful_extractions = 0
+    skipped_items = 0
     
+    # Load known dead ends and drop the ones that expired or whose page changed
+    negative_cache = load_negative_cache()
+    expired_entries = prune_negative_cache(negative_cache)
+    changed_entries = invalidate_changed_pages(negative_cache)
+    print(f"   🗃️  Negative cache: {len(negative_cache)} entries "
+          f"({expired_entries} expired, {changed_entries} pages changed since failure)")
+    failures_before = {url: entry['failed_at'] for url, entry in negative_cache.items()}
+    
+    set_phase("PHASE 2: item pages", total_items)
     for i, (item_url, item_name, wiki_category) in enumerate(unique_item_links, 1):
         print(f"\n[{i}/{total_items}] Item: {item_name} -> {wiki_category}")
-        images = extract_item_images_from_page(item_url, item_name)
+        
+        cached_failure = negative_cache.get(item_url)
+        if cached_failure:
+            print(f"   ⏭️  Skipped (known failure: {cached_failure['reason']} - {cached_failure['detail']})")
+            skipped_items += 1
+            advance_phase(skipped=True)
+            continue
+        
+        images = extract_item_images_from_page(item_url, item_name, negative_cache)
+        advance_phase()
         
         if images:
             successful_extractions += 1
@@ -706,12 +1796,29 @@ def main():
         # Respectful delay between page requests
         time.sleep(0.3)
         
-        # Progress updates every 50 items
+        # Progress updates every 50 items (and checkpoint the negative cache)
         if i % 50 == 0:
             print(f"   📈 Progress: {i}/{total_items} items processed, {len(all_images)} images collected")
+            save_negative_cache(negative_cache)
+    
+    save_negative_cache(negative_cache)
+    
+    fetched_items = total_items - skipped_items
+    print(f"\n📦 Collected {len(all_images)} images from {successful_extractions}/{fetched_items} fetched items")
+    print(f"⏭️  Skipped {skipped_items} items from the negative cache")
+    if fetched_items:
+        print(f"📈 Success rate: {(successful_extractions/fetched_items)*100:.1f}%")
     
-    print(f"\n📦 Collected {len(all_images)} images from {successful_extractions}/{total_items} items")
-    print(f"📈 Success rate: {(successful_extractions/total_items)*100:.1f}%")
+    # Failure ledger for this run - new failures grouped by reason
+    new_failures = {}
+    for url, entry in negative_cache.items():
+        if failures_before.get(url) != entry['failed_at']:
+            new_failures[entry['reason']] = new_failures.get(entry['reason'], 0) + 1
+    if new_failures:
+        print("\n🗃️  New failures by reason:")
+        for reason, count in sorted(new_failures.items()):
+            print(f"   {reason}: {count} items")
+        print(f"   Details saved to: '{NEGATIVE_CACHE_FILE}'")
     
     # Display statistics by category
     category_counts = {}
@@ -729,12 +1836,23 @@ def main():
     print(f"\n📥 PHASE 3: Starting download of all {len(all_images)} images...")
     successful_downloads = 0
     total_images = len(all_images)
+    downloaded_files = []
     
+    # Files that were already optimized in an earlier run are not queued again
+    previous_entries = {entry['file']: entry for entry in load_optimization_report().get('entries', [])}
+    
+    set_phase("PHASE 3: image downloads", total_images)
     for i, (image_url, item_name, image_variant, category) in enumerate(all_images, 1):
         print(f"⬇️  [{i}/{total_images}] Downloading: {item_name} - {image_variant}")
         
+        file_path = build_image_path(image_url, item_name, image_variant, category, OUTPUT_DIR)
+        is_new_file = not os.path.exists(file_path)
+        
         if download_image(image_url, item_name, image_variant, category, OUTPUT_DIR):
             successful_downloads += 1
+            if is_new_file or needs_optimization(previous_entries.get(file_path)):
+                downloaded_files.append(file_path)
+        advance_phase()
         
         # Short delay between downloads to be respectful
         time.sleep(0.1)
@@ -743,6 +1861,20 @@ def main():
         if i % 100 == 0:
             print(f"   📈 Download progress: {i}/{total_images} ({(i/total_images)*100:.1f}%)")
     
+    # =============================================================================
+    # PHASE 4: OPTIMIZE DOWNLOADED IMAGES
+    # =============================================================================
+    
+    optimization_report = None
+    if OPTIMIZE_IMAGES and Image is None:
+        print("\n⚠️ Pillow is not installed - skipping image optimization (pip install Pillow)")
+    elif OPTIMIZE_IMAGES and downloaded_files:
+        # Several variants can map to the same file - optimize each file once
+        downloaded_files = list(dict.fromkeys(downloaded_files))
+        print(f"\n🗜️  PHASE 4: Optimizing {len(downloaded_files)} images with {OPTIMIZE_WORKERS} workers...")
+        set_phase("PHASE 4: image optimization", len(downloaded_files))
+        optimization_report = optimize_downloaded_images(downloaded_files)
+    
     # =============================================================================
     # FINAL SUMMARY
     # =============================================================================
@@ -753,6 +1885,11 @@ def main():
     print(f"📁 All files saved to: '{OUTPUT_DIR}/'")
     print(f"📋 {len(all_categories)} categories searched")
     print(f"🔗 {len(unique_item_links)} unique items found")
+    if optimization_report:
+        saved_mb = optimization_report['saved_bytes'] / 1024 / 1024
+        print(f"🗜️  Optimization saved {saved_mb:.1f} MB in total "
+              f"({optimization_report['original_bytes']} -> {optimization_report['optimized_bytes']} bytes)")
+        print(f"📄 Optimization report: '{OPTIMIZATION_REPORT}'")
 
 
 if __name__ == "__main__":